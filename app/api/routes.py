@@ -1,19 +1,27 @@
 from app.utils.a_star import get_a_star_geojson
-from app.utils.osm import get_nearest_node, get_reachable_roads
+from app.utils.osm import get_nearest_nodes, get_reachable_roads
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import JSONResponse
 from ..models.request_models import RouteRequest
-from ..services.geocoding_service import geocode_location
-from ..services.prithvi_client import send_to_prithvi
+from ..services.geocoding_service import geocode_location_async
+from ..services.prithvi_client import send_to_prithvi_async
 
+import asyncio
+import logging
 import numpy as np
 
+logger = logging.getLogger(__name__)
+
+# Placeholder flood data source; a Generator is thread-safe and far cheaper
+# per call than np.random.choice
+_rng = np.random.default_rng()
+
 router = APIRouter()
 
 @router.post("/process")
-def process_route(data: RouteRequest):
+async def process_route(data: RouteRequest):
     # Step 1: Convert destination string → coordinates
-    dest_coords = geocode_location(data.destination)
+    dest_coords = await geocode_location_async(data.destination)
 
     if dest_coords is None:
         raise HTTPException(status_code=404, detail="Location not found")
@@ -24,7 +32,7 @@ def process_route(data: RouteRequest):
     # }
 
     # Step 2: Send to Prithvi model backend
-    # result = send_to_prithvi(start_coords, dest_coords)
+    # result = await send_to_prithvi_async(start_coords, dest_coords)
 
     
     north = max(data.start_lat,dest_coords["lat"])
@@ -33,7 +41,7 @@ def process_route(data: RouteRequest):
     west = min(data.start_lon,dest_coords["lon"])
 
     grid_shape = (20, 20)
-    flood_grid = np.random.choice([0, 1], size=grid_shape, p=[0.85, 0.15])
+    flood_grid = (_rng.random(grid_shape) < 0.15).astype(np.uint8)
     
     start_lat = data.start_lat
     start_lon = data.start_lon
@@ -42,24 +50,23 @@ def process_route(data: RouteRequest):
     end_lon = dest_coords["lon"]
     
     try:
-        G_reachable = get_reachable_roads(north=north, south=south, east=east, west=west,flood_grid=flood_grid,network_type='drive',edge_sample_points=15)
+        # OSM download and flood filtering are blocking/CPU-bound, so keep them
+        # off the event loop
+        G_reachable = await asyncio.to_thread(get_reachable_roads, north=north, south=south, east=east, west=west,flood_grid=flood_grid,network_type='drive',edge_sample_points=15)
         
-        print(f"\nReachable nodes: {len(G_reachable.nodes)}")
-        print(f"Reachable edges: {len(G_reachable.edges)}")
+        logger.debug("Reachable nodes: %d", len(G_reachable.nodes))
+        logger.debug("Reachable edges: %d", len(G_reachable.edges))
 
         route_geojson = None
         
         if len(G_reachable.nodes) >= 2:
-            print(f"\n--- Finding A* Route ---")
-            print(f"Start coordinates: ({start_lat}, {start_lon})")
-            print(f"End coordinates: ({end_lat}, {end_lon})")
+            logger.debug("Finding A* route from (%s, %s) to (%s, %s)", start_lat, start_lon, end_lat, end_lon)
             
             # Find nearest nodes to the user's coordinates
-            start_node = get_nearest_node(G_reachable, start_lat, start_lon)
-            end_node = get_nearest_node(G_reachable, end_lat, end_lon)
+            start_node, end_node = await asyncio.to_thread(get_nearest_nodes, G_reachable, [(start_lat, start_lon), (end_lat, end_lon)])
             
             # Calculate route using A*
-            route_geojson = get_a_star_geojson(G_reachable, start_node, end_node)
+            route_geojson = await asyncio.to_thread(get_a_star_geojson, G_reachable, start_node, end_node)
             
             if route_geojson is None:
                 return JSONResponse(status_code=404, content={"message": "No route found. Possible reasons: start and end are in different disconnected components, or flood has isolated one or both locations."})
@@ -67,8 +74,6 @@ def process_route(data: RouteRequest):
             return JSONResponse(status_code=401, content={"message": "Need atleast 2 nodes to compute path"})
         
         return route_geojson
-    except Exception as e:
-        print(f"\n❌ Error: {e}")
-        import traceback
-        traceback.print_exc()
+    except Exception:
+        logger.exception("Error in OSM section")
         return JSONResponse(status_code=500, content={"message": "Error in OSM section"})
\ No newline at end of file
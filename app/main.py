@@ -1,8 +1,17 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from app.api.routes import router  # Use full path instead of just 'routes'
+from app.services.http_client import start_http_client, close_http_client
 from fastapi.middleware.cors import CORSMiddleware
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Open the shared outbound HTTP client on startup, close it on shutdown
+    await start_http_client()
+    yield
+    await close_http_client()
+
+app = FastAPI(lifespan=lifespan)
 app.include_router(router)
 
 origins = [
@@ -1,24 +1,126 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
 import requests
+from requests.adapters import HTTPAdapter
 
-def geocode_location(place_name: str):
-    url = "https://nominatim.openstreetmap.org/search"
-    params = {
-        "q": place_name,
+from .http_client import get_http_client
+
+NOMINATIM_URL = "https://nominatim.openstreetmap.org/search"
+
+GEOCODE_CACHE_PATH = os.getenv("GEOCODE_CACHE_PATH", "geocode_cache.sqlite3")
+GEOCODE_MEMORY_CACHE_SIZE = 4096
+
+# Nominatim's usage policy allows at most one request per second
+NOMINATIM_MIN_INTERVAL = 1.0
+
+# Reuse pooled connections (and TLS sessions) across requests
+_SESSION = requests.Session()
+_SESSION.headers.update({
+    "User-Agent": "Flood-Rescue-System"
+})
+_SESSION.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=20))
+
+# In-process LRU in front of a persistent SQLite cache, both keyed on the
+# normalized place name
+_memory_cache: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+_db = sqlite3.connect(GEOCODE_CACHE_PATH, check_same_thread=False)
+_db.execute("CREATE TABLE IF NOT EXISTS geocode (query TEXT PRIMARY KEY, lat REAL, lon REAL)")
+_db.commit()
+
+_rate_lock = threading.Lock()
+_last_request_time = 0.0
+
+def _normalize(place_name: str) -> str:
+    return " ".join(place_name.split()).lower()
+
+def _cache_get(key: str) -> Optional[Tuple[float, float]]:
+    with _cache_lock:
+        if key in _memory_cache:
+            _memory_cache.move_to_end(key)
+            return _memory_cache[key]
+
+        row = _db.execute("SELECT lat, lon FROM geocode WHERE query = ?", (key,)).fetchone()
+        if row is not None:
+            _memory_put(key, row)
+        return row
+
+def _cache_put(key: str, coords: Tuple[float, float]):
+    with _cache_lock:
+        _memory_put(key, coords)
+        _db.execute("INSERT OR REPLACE INTO geocode (query, lat, lon) VALUES (?, ?, ?)",
+                    (key, coords[0], coords[1]))
+        _db.commit()
+
+def _memory_put(key: str, coords: Tuple[float, float]):
+    # Caller must hold _cache_lock
+    _memory_cache[key] = coords
+    _memory_cache.move_to_end(key)
+    if len(_memory_cache) > GEOCODE_MEMORY_CACHE_SIZE:
+        _memory_cache.popitem(last=False)
+
+def _reserve_request_slot() -> float:
+    """
+    Reserve the next Nominatim request slot, shared by all threads and
+    coroutines, and return how many seconds to wait before using it.
+    """
+    global _last_request_time
+    with _rate_lock:
+        now = time.monotonic()
+        slot = max(now, _last_request_time + NOMINATIM_MIN_INTERVAL)
+        _last_request_time = slot
+        return slot - now
+
+def _query_params(key: str):
+    return {
+        "q": key,
         "format": "json",
         "limit": 1
     }
 
-    headers = {
-        "User-Agent": "Flood-Rescue-System"
-    }
+def _parse_response(key: str, data):
+    if not data:
+        return None
 
-    response = requests.get(url, params=params, headers=headers)
-    data = response.json()
+    coords = (float(data[0]["lat"]), float(data[0]["lon"]))
+    _cache_put(key, coords)
+    return coords
 
-    if not data:
+def _to_dict(coords: Optional[Tuple[float, float]]):
+    if coords is None:
         return None
 
     return {
-        "lat": float(data[0]["lat"]),
-        "lon": float(data[0]["lon"])
+        "lat": coords[0],
+        "lon": coords[1]
     }
+
+def geocode_location(place_name: str):
+    key = _normalize(place_name)
+
+    coords = _cache_get(key)
+    if coords is None:
+        time.sleep(_reserve_request_slot())
+        response = _SESSION.get(NOMINATIM_URL, params=_query_params(key), timeout=5)
+        coords = _parse_response(key, response.json())
+
+    return _to_dict(coords)
+
+async def geocode_location_async(place_name: str):
+    """Async variant of geocode_location, sharing its caches and rate limit."""
+    key = _normalize(place_name)
+
+    coords = _cache_get(key)
+    if coords is None:
+        await asyncio.sleep(_reserve_request_slot())
+        response = await get_http_client().get(NOMINATIM_URL, params=_query_params(key), timeout=5)
+        coords = _parse_response(key, response.json())
+
+    return _to_dict(coords)
@@ -0,0 +1,25 @@
+from typing import Optional
+
+import httpx
+
+# Shared async client for outbound HTTP, opened and closed with the app
+_client: Optional[httpx.AsyncClient] = None
+
+async def start_http_client():
+    global _client
+    _client = httpx.AsyncClient(
+        http2=True,
+        headers={"User-Agent": "Flood-Rescue-System"},
+        limits=httpx.Limits(max_keepalive_connections=20)
+    )
+
+async def close_http_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+def get_http_client() -> httpx.AsyncClient:
+    if _client is None:
+        raise RuntimeError("HTTP client is not started; it is opened in the app lifespan")
+    return _client
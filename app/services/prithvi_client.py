@@ -1,11 +1,21 @@
 import requests
 import os
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+
+from .http_client import get_http_client
 
 load_dotenv()
 
 PRITHVI_API_URL=os.getenv("PRITHVI_API_URL")
 
+# Reuse pooled connections (and TLS sessions) across requests
+_SESSION = requests.Session()
+_SESSION.headers.update({
+    "User-Agent": "Flood-Rescue-System"
+})
+_SESSION.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=20))
+
 def send_to_prithvi(start_coords, dest_coords):
     
     payload = {
@@ -13,6 +23,18 @@ def send_to_prithvi(start_coords, dest_coords):
         "destination": dest_coords
     }
 
-    response = requests.post(PRITHVI_API_URL, json=payload)
+    response = _SESSION.post(PRITHVI_API_URL, json=payload)
+
+    return response.json()
+
+async def send_to_prithvi_async(start_coords, dest_coords):
+    
+    payload = {
+        "start": start_coords,
+        "destination": dest_coords
+    }
+
+    # Model inference latency is unknown, so don't apply httpx's default timeout
+    response = await get_http_client().post(PRITHVI_API_URL, json=payload, timeout=None)
 
     return response.json()
@@ -1,5 +1,39 @@
-from math import radians, cos, sin, asin, sqrt
+import logging
 import networkx as nx
+import numpy as np
+from numba import njit
+from scipy.sparse.csgraph import dijkstra
+from .osm import get_edge_matrix, get_node_arrays, landmark_lower_bounds
+
+logger = logging.getLogger(__name__)
+
+@njit(cache=True, fastmath=True)
+def _haversine_radians(lat1, lon1, cos_lat1, lat2, lon2, cos_lat2):
+    """
+    Great-circle distance in meters between two (lat, lon) points in radians.
+    
+    cos(lat) of both points is passed in so callers can take it from a
+    precomputed table. The first point may be arrays.
+    """
+    dlon, dlat = lon2 - lon1, lat2 - lat1
+    a = np.sin(dlat * 0.5)**2 + cos_lat1 * cos_lat2 * np.sin(dlon * 0.5)**2
+    return 2 * np.arcsin(np.sqrt(a)) * 6371000
+
+@njit(cache=True, fastmath=True)
+def _haversine(lat1, lon1, lat2, lon2):
+    """Great-circle distance in meters between two (lat, lon) points in degrees."""
+    lat1, lat2 = np.radians(lat1), np.radians(lat2)
+    return _haversine_radians(lat1, np.radians(lon1), np.cos(lat1),
+                              lat2, np.radians(lon2), np.cos(lat2))
+
+@njit(cache=True, fastmath=True)
+def _equirectangular(x1, y1, x2, y2):
+    """Distance in meters between points in equirectangular projection; the first may be arrays."""
+    return np.sqrt((x1 - x2)**2 + (y1 - y2)**2)
+
+# Compile at import time so the first route request doesn't pay for the JIT
+_haversine(0.0, 0.0, 0.0, 0.0)
+_equirectangular(np.zeros(1), np.zeros(1), 0.0, 0.0)
 
 def haversine_distance(u, v, G):
     """Heuristic function: straight-line distance in meters."""
@@ -7,12 +41,89 @@ def haversine_distance(u, v, G):
     node_v = G.nodes[v]
     
     # OSMnx uses 'y' for lat, 'x' for lon
-    lat1, lon1 = radians(node_u['y']), radians(node_u['x'])
-    lat2, lon2 = radians(node_v['y']), radians(node_v['x'])
+    return _haversine(node_u['y'], node_u['x'], node_v['y'], node_v['x'])
+
+def _lower_bounds(G, nodes, node, to_node):
+    """
+    Consistent lower bound on the shortest-path distance between every node
+    and the given node: to it if to_node, otherwise from it.
+    """
+    # Straight-line distance in the nodes' equirectangular projection; over a
+    # city-sized graph it is within a fraction of a percent of haversine and
+    # projected to stay below it, without any trig per node
+    row = nodes.index[node]
+    bounds = _equirectangular(nodes.x_m, nodes.y_m, nodes.x_m[row], nodes.y_m[row])
     
-    dlon, dlat = lon2 - lon1, lat2 - lat1
-    a = sin(dlat / 2)**2 + cos(lat1) * cos(lat2) * sin(dlon / 2)**2
-    return 2 * asin(sqrt(a)) * 6371000
+    # Both bounds are admissible, so their maximum is too; the landmark
+    # (ALT) bound is usually much tighter on road networks
+    if 'landmarks' in G.graph:
+        bounds = np.maximum(bounds, landmark_lower_bounds(G.graph['landmarks'], nodes.node_ids, node,
+                                                          to_node=to_node))
+    return bounds
+
+def _is_closed(matrix, rows, reached):
+    """True if no edge of the matrix leads from a reached row to an unreached one."""
+    return bool(reached[matrix.indices[reached[rows]]].all())
+
+def _bidirectional_astar_csr(edges, to_end, from_start, start, end):
+    """
+    Bidirectional A* over a sparse edge matrix, returning the path as a list
+    of rows, or None if end can't be reached from start.
+    
+    to_end / from_start are consistent lower bounds on the distance from
+    every node to end / from start to every node. With the symmetric
+    potential p = (to_end - from_start) / 2, A* in both directions is
+    Dijkstra on the same reduced costs w(u, v) - p(u) + p(v), so both
+    searches run as scipy's C Dijkstra, bounded by a search radius r that
+    doubles each round:
+    
+    - once the best path through an edge joining the two searches is no
+      longer than 2r, it is the shortest path;
+    - once either search runs out of edges leaving its region, the other
+      side can't be reached, which exits early when a flood isolates the
+      start or the destination in a small pocket.
+    """
+    if start == end:
+        return [start]
+    
+    potential = (to_end - from_start) / 2
+    rows = np.repeat(np.arange(edges.shape[0]), np.diff(edges.indptr))
+    reduced = edges.copy()
+    # The potential is consistent, so only floating point error can make these negative
+    reduced.data = np.maximum(edges.data - potential[rows] + potential[edges.indices], 0)
+    reduced_t = reduced.T.tocsr()
+    rows_t = np.repeat(np.arange(reduced_t.shape[0]), np.diff(reduced_t.indptr))
+    
+    radius = max(0.125 * (to_end[start] + from_start[end]), 100.0)
+    while True:
+        dist_f, pred_f = dijkstra(reduced, directed=True, indices=start,
+                                  return_predecessors=True, limit=radius)
+        dist_b, pred_b = dijkstra(reduced_t, directed=True, indices=end,
+                                  return_predecessors=True, limit=radius)
+        
+        # Best path crossing from the forward side to the backward side
+        through = dist_f[rows] + reduced.data + dist_b[reduced.indices]
+        best = int(np.argmin(through))
+        if through[best] <= 2 * radius:
+            break
+        
+        if (_is_closed(reduced, rows, np.isfinite(dist_f)) or
+                _is_closed(reduced_t, rows_t, np.isfinite(dist_b))):
+            if np.isfinite(through[best]):
+                break
+            return None
+        radius *= 2
+    
+    # Walk back to start from the meeting edge's tail, then on to end from its head
+    path = [int(rows[best])]
+    while path[-1] != start:
+        path.append(int(pred_f[path[-1]]))
+    path.reverse()
+    
+    path.append(int(reduced.indices[best]))
+    while path[-1] != end:
+        path.append(int(pred_b[path[-1]]))
+    return path
 
 def get_a_star_geojson(G, start_node, end_node):
     """
@@ -33,24 +144,30 @@ def get_a_star_geojson(G, start_node, end_node):
         GeoJSON FeatureCollection with the route, or None if no path exists
     """
     try:
-        # Run A* with haversine heuristic
-        path = nx.astar_path(
-            G, 
-            start_node, 
-            end_node, 
-            heuristic=lambda u, v: haversine_distance(u, v, G), 
-            weight='length'
-        )
+        nodes = get_node_arrays(G)
+        start, end = nodes.index[start_node], nodes.index[end_node]
+        
+        # Lower bounds on the distance from every node to the destination and
+        # from the start to every node, computed up front in one pass each
+        to_end = _lower_bounds(G, nodes, end_node, to_node=True)
+        from_start = _lower_bounds(G, nodes, start_node, to_node=False)
+        
+        # Run bidirectional A* with the combined straight-line / landmark heuristic
+        edges = get_edge_matrix(G)
+        path_rows = _bidirectional_astar_csr(edges, to_end, from_start, start, end)
+        if path_rows is None:
+            raise nx.NetworkXNoPath()
+        path = nodes.node_ids[path_rows].tolist()
         
-        # Calculate total distance from edge attributes
-        total_dist = 0
-        for u, v in zip(path[:-1], path[1:]):
-            # For MultiDiGraph, get the edge with minimum length
-            edge_data = min(G[u][v].values(), key=lambda x: x.get('length', 0))
-            total_dist += edge_data.get('length', 0)
+        # Calculate total distance from the edge matrix, which already holds
+        # the minimum length over parallel edges of the MultiDiGraph
+        path_rows = np.asarray(path_rows)
+        total_dist = 0.0
+        if len(path_rows) > 1:
+            total_dist = float(np.asarray(edges[path_rows[:-1], path_rows[1:]]).sum())
         
         # Build GeoJSON coordinates [longitude, latitude]
-        line_coords = [[G.nodes[n]['x'], G.nodes[n]['y']] for n in path]
+        line_coords = np.column_stack([nodes.lon[path_rows], nodes.lat[path_rows]]).tolist()
         
         geojson = {
             "type": "FeatureCollection",
@@ -72,13 +189,13 @@ def get_a_star_geojson(G, start_node, end_node):
             ]
         }
         
-        print(f"\n✓ Route found: {len(path)} nodes, {total_dist/1000:.2f} km")
+        logger.debug("Route found: %d nodes, %.2f km", len(path), total_dist / 1000)
         return geojson
         
     except nx.NetworkXNoPath:
-        print(f"\n✗ No path exists between nodes {start_node} and {end_node}")
+        logger.debug("No path exists between nodes %s and %s", start_node, end_node)
         return None
-    except Exception as e:
-        print(f"\n✗ Error finding path: {e}")
+    except Exception:
+        logger.exception("Error finding path")
         return None
 
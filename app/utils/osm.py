@@ -1,8 +1,32 @@
+import logging
+import math
+import time
+from functools import lru_cache
 import osmnx as ox
-from typing import Tuple, Optional
+from typing import Dict, List, NamedTuple, Tuple, Optional
+import shapely
 from shapely.geometry import Point, LineString
 import numpy as np
 import networkx as nx
+import scipy.sparse as sp
+from scipy.sparse.csgraph import dijkstra
+from scipy.spatial import cKDTree
+
+logger = logging.getLogger(__name__)
+
+# Keep OSMnx's on-disk cache of Overpass responses (in ./cache) enabled
+ox.settings.use_cache = True
+
+# In-process cache of downloaded road networks. Bounding boxes are snapped
+# outward to BBOX_PRECISION decimal places (~110 m) so nearby requests share
+# an entry, and entries expire after ROAD_NETWORK_CACHE_TTL seconds.
+ROAD_NETWORK_CACHE_SIZE = 32
+ROAD_NETWORK_CACHE_TTL = 24 * 60 * 60
+BBOX_PRECISION = 3
+
+# Slightly below the radius OSMnx uses for edge lengths, so that distance
+# estimates stay lower bounds on them
+EARTH_RADIUS_M = 6371000
 
 def get_nearest_node(G, lat: float, lon: float):
     """
@@ -20,73 +44,394 @@ def get_nearest_node(G, lat: float, lon: float):
     int
         Node ID of nearest node
     """
+    return get_nearest_nodes(G, [(lat, lon)])[0]
+
+def get_nearest_nodes(G, points: List[Tuple[float, float]]) -> List[int]:
+    """
+    Find the closest node in the graph to each (lat, lon) point in one query.
+    
+    Parameters:
+    -----------
+    G : nx.MultiDiGraph
+        Road network graph
+    points : list of (lat, lon)
+        Coordinates to find nearest nodes to
+    
+    Returns:
+    --------
+    list of int
+        Node ID of the nearest node to each point
+    """
     if len(G.nodes) == 0:
         raise ValueError("Graph has no nodes!")
     
-    # OSMnx expects X=Longitude, Y=Latitude
-    nearest_node_id = ox.distance.nearest_nodes(G, X=lon, Y=lat)
+    nodes = get_node_arrays(G)
+    node_tree = get_node_tree(G)
+    
+    lats = np.array([lat for lat, _ in points], dtype=np.float64)
+    lons = np.array([lon for _, lon in points], dtype=np.float64)
+    _, rows = node_tree.tree.query(np.column_stack([lons * node_tree.lon_scale, lats]))
+    
+    nearest_node_ids = nodes.node_ids[rows].tolist()
     
     # Get node coordinates for verification
-    node_data = G.nodes[nearest_node_id]
-    print(f"Nearest node to ({lat:.4f}, {lon:.4f}): "
-          f"Node {nearest_node_id} at ({node_data['y']:.4f}, {node_data['x']:.4f})")
+    if logger.isEnabledFor(logging.DEBUG):
+        for (lat, lon), row, nearest_node_id in zip(points, rows, nearest_node_ids):
+            logger.debug("Nearest node to (%.4f, %.4f): Node %s at (%.4f, %.4f)",
+                         lat, lon, nearest_node_id, nodes.lat[row], nodes.lon[row])
     
-    return nearest_node_id
+    return nearest_node_ids
 
-def get_road_network(north, south, east, west, network_type="drive"):
+@lru_cache(maxsize=ROAD_NETWORK_CACHE_SIZE)
+def _download_road_network(north, south, east, west, network_type, time_bucket):
+    # time_bucket is only part of the cache key, so entries expire with it
     G = ox.graph_from_bbox(
         bbox=(west, south, east, north),
         network_type=network_type,
         simplify=True
     )
+    # Precompute landmark distances once per download; graph copies share them
+    # through G.graph, and they stay valid lower bounds on any subgraph
+    G.graph['landmarks'] = build_landmarks(G)
     return G
 
+def get_road_network(north, south, east, west, network_type="drive"):
+    """
+    Get the road network inside a bounding box, reusing cached downloads.
+    
+    The download covers the bounding box snapped outward to BBOX_PRECISION
+    decimal places and is then truncated back to the requested box. The
+    returned graph is a fresh copy that callers are free to modify.
+    """
+    scale = 10 ** BBOX_PRECISION
+    snapped_bbox = (
+        round(math.ceil(north * scale) / scale, BBOX_PRECISION),
+        round(math.floor(south * scale) / scale, BBOX_PRECISION),
+        round(math.ceil(east * scale) / scale, BBOX_PRECISION),
+        round(math.floor(west * scale) / scale, BBOX_PRECISION),
+    )
+    time_bucket = int(time.time() // ROAD_NETWORK_CACHE_TTL)
+    G_cached = _download_road_network(*snapped_bbox, network_type, time_bucket)
+    
+    nodes = build_node_arrays(G_cached)
+    inside = ((nodes.lat <= north) & (nodes.lat >= south) &
+              (nodes.lon >= west) & (nodes.lon <= east))
+    return G_cached.subgraph(nodes.node_ids[inside].tolist()).copy()
+
+
+class NodeArrays(NamedTuple):
+    """Node coordinates of a graph laid out as parallel NumPy arrays."""
+    node_ids: np.ndarray
+    index: Dict[int, int]
+    lat: np.ndarray
+    lon: np.ndarray
+    x_m: np.ndarray
+    y_m: np.ndarray
+
+
+def build_node_arrays(G: nx.MultiDiGraph) -> NodeArrays:
+    """
+    Build structure-of-arrays node coordinates for a graph.
+    
+    Row i of lat/lon holds the coordinates of node node_ids[i], and index
+    maps a node ID back to its row. x_m/y_m are the same coordinates in a
+    local equirectangular projection in meters, for fast distance bounds.
+    """
+    n_nodes = len(G)
+    node_ids = np.fromiter(G.nodes, dtype=np.int64, count=n_nodes)
+    # OSMnx uses 'y' for lat, 'x' for lon
+    lat = np.fromiter((y for _, y in G.nodes(data='y')), dtype=np.float64, count=n_nodes)
+    lon = np.fromiter((x for _, x in G.nodes(data='x')), dtype=np.float64, count=n_nodes)
+    index = {n: i for i, n in enumerate(node_ids.tolist())}
+    
+    # Scale longitudes by cos() of the latitude farthest from the equator so
+    # that projected distances never overestimate great-circle distances
+    cos_lat0 = np.cos(np.radians(np.abs(lat).max())) if n_nodes else 1.0
+    x_m = np.radians(lon) * (EARTH_RADIUS_M * cos_lat0)
+    y_m = np.radians(lat) * EARTH_RADIUS_M
+    return NodeArrays(node_ids, index, lat, lon, x_m, y_m)
+
+
+def get_node_arrays(G: nx.MultiDiGraph) -> NodeArrays:
+    """
+    Return the node arrays stored on the graph, building them if missing.
+    
+    The arrays are cached in G.graph['node_arrays'], so they must be rebuilt
+    with build_node_arrays if nodes are added or removed afterwards.
+    """
+    if 'node_arrays' not in G.graph:
+        G.graph['node_arrays'] = build_node_arrays(G)
+    return G.graph['node_arrays']
+
+
+class NodeTree(NamedTuple):
+    """KD-tree over node coordinates, with longitudes scaled by lon_scale."""
+    tree: cKDTree
+    lon_scale: float
+
+
+def get_node_tree(G: nx.MultiDiGraph) -> NodeTree:
+    """
+    Return the node KD-tree stored on the graph, building it if missing.
+    
+    Longitudes are scaled by cos(mean latitude) so that Euclidean distance
+    in the tree approximates ground distance over the graph's small extent.
+    Rows follow get_node_arrays(G), and the tree is cached in G.graph.
+    """
+    if 'node_tree' not in G.graph:
+        nodes = get_node_arrays(G)
+        lon_scale = float(np.cos(np.radians(nodes.lat.mean())))
+        tree = cKDTree(np.column_stack([nodes.lon * lon_scale, nodes.lat]))
+        G.graph['node_tree'] = NodeTree(tree, lon_scale)
+    return G.graph['node_tree']
+
+
+def build_edge_matrix(G: nx.MultiDiGraph, nodes: NodeArrays) -> sp.csr_matrix:
+    """
+    Build a sparse adjacency matrix of edge lengths for a graph.
+    
+    Entry (i, j) is the length of the shortest edge from node_ids[i] to
+    node_ids[j]; parallel edges of the MultiDiGraph collapse to that minimum.
+    """
+    n_nodes = len(nodes.node_ids)
+    n_edges = G.number_of_edges()
+    
+    u = np.empty(n_edges, dtype=np.int64)
+    v = np.empty(n_edges, dtype=np.int64)
+    length = np.empty(n_edges, dtype=np.float64)
+    for i, (a, b, edge_length) in enumerate(G.edges(data='length', default=0.0)):
+        u[i] = nodes.index[a]
+        v[i] = nodes.index[b]
+        length[i] = edge_length
+    
+    # Sort by (u, v, length) and keep the first, i.e. shortest, of each pair
+    order = np.lexsort((length, v, u))
+    u, v, length = u[order], v[order], length[order]
+    first = np.ones(n_edges, dtype=bool)
+    first[1:] = (u[1:] != u[:-1]) | (v[1:] != v[:-1])
+    
+    return sp.csr_matrix((length[first], (u[first], v[first])), shape=(n_nodes, n_nodes))
+
+
+def get_edge_matrix(G: nx.MultiDiGraph) -> sp.csr_matrix:
+    """
+    Return the edge matrix stored on the graph, building it if missing.
+    
+    Rows and columns follow get_node_arrays(G). Like the node arrays, it is
+    cached in G.graph and must be rebuilt if the graph changes.
+    """
+    if 'edge_matrix' not in G.graph:
+        G.graph['edge_matrix'] = build_edge_matrix(G, get_node_arrays(G))
+    return G.graph['edge_matrix']
+
+
+class Landmarks(NamedTuple):
+    """Shortest-path distances between every node and a few landmark nodes."""
+    index: Dict[int, int]
+    from_landmark: np.ndarray
+    to_landmark: np.ndarray
+
+
+def _pick_landmarks(nodes: NodeArrays) -> List[int]:
+    """Pick landmark rows at the extremes of the graph plus one near its centre."""
+    lat, lon = nodes.lat, nodes.lon
+    rows = [
+        np.argmax(lat), np.argmin(lat), np.argmax(lon), np.argmin(lon),
+        np.argmax(lat + lon), np.argmin(lat + lon),
+        np.argmax(lat - lon), np.argmin(lat - lon),
+        np.argmin((lat - lat.mean())**2 + (lon - lon.mean())**2),
+    ]
+    return list(dict.fromkeys(int(r) for r in rows))
+
+
+def build_landmarks(G: nx.MultiDiGraph) -> Landmarks:
+    """
+    Precompute ALT (A*, landmarks, triangle inequality) distances for a graph.
+    
+    Row index[n] of from_landmark / to_landmark holds the shortest-path
+    length from each landmark to node n / from node n to each landmark,
+    or inf where no path exists.
+    """
+    nodes = build_node_arrays(G)
+    landmark_rows = _pick_landmarks(nodes) if len(G) else []
+    
+    if not landmark_rows:
+        empty = np.empty((len(G), 0))
+        return Landmarks(nodes.index, empty, empty)
+    
+    edges = build_edge_matrix(G, nodes)
+    from_landmark = dijkstra(edges, directed=True, indices=landmark_rows).T
+    to_landmark = dijkstra(edges.T.tocsr(), directed=True, indices=landmark_rows).T
+    
+    return Landmarks(nodes.index, from_landmark, to_landmark)
 
-def grid_coords_to_latlon(grid_row: int, grid_col: int, 
-                          north: float, south: float, 
-                          east: float, west: float,
-                          grid_shape: Tuple[int, int]) -> Tuple[float, float]:
-    """Convert grid coordinates to latitude/longitude."""
+
+def landmark_lower_bounds(landmarks: Landmarks, node_ids: np.ndarray, node: int,
+                          to_node: bool = True) -> np.ndarray:
+    """
+    ALT lower bound on the shortest-path length from every node to node, or
+    from node to every node if to_node is False.
+    
+    Uses d(u, t) >= d(L, t) - d(L, u) and d(u, t) >= d(u, L) - d(t, L). The
+    distances may come from any supergraph of the graph being searched,
+    since removing nodes or edges can only make paths longer.
+    """
+    rows = np.fromiter((landmarks.index[n] for n in node_ids.tolist()),
+                       dtype=np.int64, count=len(node_ids))
+    t = landmarks.index[node]
+    
+    from_lm, to_lm = landmarks.from_landmark, landmarks.to_landmark
+    with np.errstate(invalid='ignore'):
+        if to_node:
+            bounds = np.concatenate([from_lm[t] - from_lm[rows], to_lm[rows] - to_lm[t]], axis=1)
+        else:
+            bounds = np.concatenate([from_lm[rows] - from_lm[t], to_lm[t] - to_lm[rows]], axis=1)
+    
+    # Landmarks that can't reach (or be reached from) a node give no bound
+    bounds[~np.isfinite(bounds)] = 0
+    return np.maximum(bounds.max(axis=1, initial=0), 0)
+
+
+class GridTransform(NamedTuple):
+    """Bounding box of a flood grid with its degrees-to-cells scales precomputed."""
+    north: float
+    south: float
+    east: float
+    west: float
+    row_scale: float
+    col_scale: float
+    rows: int
+    cols: int
+
+
+def make_grid_transform(north: float, south: float,
+                        east: float, west: float,
+                        grid_shape: Tuple[int, int]) -> GridTransform:
+    """Precompute the mapping between lat/lon and a grid covering the bounding box."""
     rows, cols = grid_shape
-    lat = north - (grid_row / rows) * (north - south)
-    lon = west + (grid_col / cols) * (east - west)
+    return GridTransform(north, south, east, west,
+                         rows / (north - south), cols / (east - west),
+                         rows, cols)
+
+
+def grid_coords_to_latlon(grid_row, grid_col,
+                          transform: GridTransform) -> Tuple[np.ndarray, np.ndarray]:
+    """Convert grid coordinates (scalars or arrays) to latitude/longitude."""
+    lat = transform.north - np.asarray(grid_row) / transform.row_scale
+    lon = transform.west + np.asarray(grid_col) / transform.col_scale
     return lat, lon
 
 
-def latlon_to_grid_coords(lat: float, lon: float,
-                          north: float, south: float,
-                          east: float, west: float,
-                          grid_shape: Tuple[int, int]) -> Tuple[int, int]:
-    """Convert latitude/longitude to grid coordinates."""
-    rows, cols = grid_shape
+def latlon_to_grid_coords(lat, lon,
+                          transform: GridTransform) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Convert latitude/longitude (scalars or arrays) to grid coordinates.
     
-    row = int((north - lat) / (north - south) * rows)
-    col = int((lon - west) / (east - west) * cols)
+    Returns row and column indices together with a mask of which points
+    fall inside the grid; indices of points outside it are meaningless.
+    """
+    row = ((transform.north - np.asarray(lat)) * transform.row_scale).astype(np.int32)
+    col = ((np.asarray(lon) - transform.west) * transform.col_scale).astype(np.int32)
     
-    if 0 <= row < rows and 0 <= col < cols:
-        return row, col
-    return None
+    in_bounds = (row >= 0) & (row < transform.rows) & (col >= 0) & (col < transform.cols)
+    return row, col, in_bounds
 
 
-def is_node_flooded(node_lat: float, node_lon: float, 
+def is_node_flooded(node_lat, node_lon,
                     flood_grid: np.ndarray,
-                    north: float, south: float, 
-                    east: float, west: float) -> bool:
-    """Check if a node location is flooded based on the grid."""
-    grid_coords = latlon_to_grid_coords(node_lat, node_lon, north, south, 
-                                        east, west, flood_grid.shape)
+                    transform: GridTransform):
+    """
+    Check if node locations (scalars or arrays) are flooded based on the grid.
+    
+    Locations outside the grid are never flooded.
+    """
+    row, col, in_bounds = latlon_to_grid_coords(node_lat, node_lon, transform)
+    
+    # Clip so out-of-bounds points index safely; in_bounds masks them out
+    row = np.clip(row, 0, transform.rows - 1)
+    col = np.clip(col, 0, transform.cols - 1)
+    return in_bounds & (flood_grid[row, col] == 1)
+
+
+def _sample_lines_coords(coords: np.ndarray, line_index: np.ndarray, n_lines: int,
+                         sample_points: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Sample evenly spaced (lon, lat) points along many polylines by arc length.
+    
+    coords holds the vertices of all lines back to back and line_index the
+    line each vertex belongs to, in ascending order, as returned by
+    shapely.get_coordinates(..., return_index=True). Every line is sampled
+    with the same number of points, so the returned arrays have shape
+    (n_lines * sample_points,) and the samples of line i live at
+    [i * sample_points:(i + 1) * sample_points].
+    """
+    n_coords = np.bincount(line_index, minlength=n_lines)
+    starts = np.concatenate(([0], np.cumsum(n_coords)[:-1]))
+    line_id = line_index
+    
+    # Cumulative arc length of every vertex, restarting at 0 on each line
+    seg_lengths = np.hypot(np.diff(coords[:, 0]), np.diff(coords[:, 1]))
+    cum_lengths = np.concatenate(([0.0], np.cumsum(seg_lengths)))
+    cum_lengths -= cum_lengths[starts][line_id]
+    line_lengths = cum_lengths[starts + n_coords - 1]
+    
+    # Normalized position of every vertex along its line; zero-length lines
+    # fall back to the vertex index so positions stay strictly inside [0, 1]
+    vertex_pos = np.arange(len(coords)) - starts[line_id]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        frac = np.where(line_lengths[line_id] > 0,
+                        cum_lengths / line_lengths[line_id],
+                        vertex_pos / (n_coords[line_id] - 1))
+    
+    # Offset each line by 2 so that np.interp never blends two lines together
+    keys = line_id * 2.0 + frac
+    targets = (np.arange(n_lines)[:, None] * 2.0
+               + np.linspace(0, 1, sample_points)[None, :]).ravel()
+    
+    lons = np.interp(targets, keys, coords[:, 0])
+    lats = np.interp(targets, keys, coords[:, 1])
+    return lons, lats
+
+
+def _lines_may_flood(coords: np.ndarray, line_index: np.ndarray, n_lines: int,
+                     flood_grid: np.ndarray, transform: GridTransform) -> np.ndarray:
+    """
+    Cheap bounding-box pre-filter for the per-line flood check.
+    
+    Returns a mask of the lines whose bounding box covers at least one
+    flooded cell. Every point sampled along a line lies inside its bounding
+    box, so lines outside the mask can never be flooded.
+    """
+    # Summed-area table of flooded cells, padded so window sums need no edge cases
+    flooded_cells = np.zeros((transform.rows + 1, transform.cols + 1), dtype=np.int32)
+    flooded_cells[1:, 1:] = (flood_grid == 1).cumsum(axis=0).cumsum(axis=1)
     
-    if grid_coords is None:
-        return False
+    starts = np.flatnonzero(np.r_[True, line_index[1:] != line_index[:-1]])
+    min_lon = np.minimum.reduceat(coords[:, 0], starts)
+    max_lon = np.maximum.reduceat(coords[:, 0], starts)
+    min_lat = np.minimum.reduceat(coords[:, 1], starts)
+    max_lat = np.maximum.reduceat(coords[:, 1], starts)
     
-    row, col = grid_coords
-    return flood_grid[row, col] == 1
+    # Rows grow southwards, so the northern edge of the box gives the first row;
+    # clipping to the grid only widens the window, which keeps the filter safe
+    row0, col0, _ = latlon_to_grid_coords(max_lat, min_lon, transform)
+    row1, col1, _ = latlon_to_grid_coords(min_lat, max_lon, transform)
+    row0 = np.clip(row0, 0, transform.rows)
+    col0 = np.clip(col0, 0, transform.cols)
+    row1 = np.clip(row1 + 1, 0, transform.rows)
+    col1 = np.clip(col1 + 1, 0, transform.cols)
+    
+    n_flooded = (flooded_cells[row1, col1] - flooded_cells[row0, col1]
+                 - flooded_cells[row1, col0] + flooded_cells[row0, col0])
+    
+    may_flood = np.zeros(n_lines, dtype=bool)
+    may_flood[line_index[starts]] = n_flooded > 0
+    return may_flood
 
 
 def is_edge_flooded(edge_geometry: LineString,
                     flood_grid: np.ndarray,
-                    north: float, south: float,
-                    east: float, west: float,
+                    transform: GridTransform,
                     sample_points: int = 10) -> bool:
     """
     Check if an edge passes through flooded areas by sampling points along it.
@@ -97,8 +442,8 @@ def is_edge_flooded(edge_geometry: LineString,
         The geometry of the road edge
     flood_grid : np.ndarray
         2D array where 1 = flooded, 0 = dry
-    north, south, east, west : float
-        Bounding box coordinates
+    transform : GridTransform
+        Mapping from lat/lon to flood grid cells (see make_grid_transform)
     sample_points : int
         Number of points to sample along the edge (higher = more accurate)
     
@@ -107,17 +452,100 @@ def is_edge_flooded(edge_geometry: LineString,
     bool
         True if any point along the edge is in a flooded zone
     """
-    # Sample points along the line
-    distances = np.linspace(0, edge_geometry.length, sample_points)
+    # Sample all points along the line at once
+    coords = shapely.get_coordinates(edge_geometry)
+    lons, lats = _sample_lines_coords(coords, np.zeros(len(coords), dtype=np.int64), 1,
+                                      sample_points)
+    
+    return bool(is_node_flooded(lats, lons, flood_grid, transform).any())
+
+
+def get_flooded_edges(G: nx.MultiDiGraph,
+                      flood_grid: np.ndarray,
+                      transform: GridTransform,
+                      sample_points: int = 10) -> List[Tuple[int, int, int]]:
+    """
+    Check every edge of the graph for flooding in a single batched pass.
+    
+    Equivalent to calling is_edge_flooded on each edge, but all sample
+    points of all edges are checked against the grid at once.
+    
+    Returns:
+    --------
+    list
+        (u, v, key) tuples of the flooded edges
+    """
+    # Edges with a geometry come first, then straight edges between their nodes
+    geom_keys, geoms = [], []
+    straight_keys = []
+    for u, v, key, geometry in G.edges(keys=True, data='geometry'):
+        if geometry is None:
+            straight_keys.append((u, v, key))
+        else:
+            geom_keys.append((u, v, key))
+            geoms.append(geometry)
+    
+    edge_keys = geom_keys + straight_keys
+    if not edge_keys:
+        return []
+    
+    # Pull every vertex out of GEOS in one call instead of one per edge
+    geom_coords, geom_index = shapely.get_coordinates(np.array(geoms, dtype=object),
+                                                      return_index=True)
+    
+    nodes = build_node_arrays(G)
+    ends = np.fromiter((nodes.index[n] for u, v, _ in straight_keys for n in (u, v)),
+                       dtype=np.int64, count=2 * len(straight_keys))
+    straight_coords = np.column_stack([nodes.lon[ends], nodes.lat[ends]])
+    straight_index = len(geom_keys) + np.arange(len(ends)) // 2
+    
+    coords = np.concatenate([geom_coords, straight_coords])
+    line_index = np.concatenate([geom_index, straight_index])
+    
+    # Only sample the edges whose bounding box touches a flooded cell
+    candidates = np.flatnonzero(_lines_may_flood(coords, line_index, len(edge_keys),
+                                                 flood_grid, transform))
+    if len(candidates) == 0:
+        return []
+    
+    renumber = np.full(len(edge_keys), -1, dtype=np.int64)
+    renumber[candidates] = np.arange(len(candidates))
+    keep = renumber[line_index] >= 0
+    
+    lons, lats = _sample_lines_coords(coords[keep], renumber[line_index[keep]],
+                                      len(candidates), sample_points)
+    flooded = is_node_flooded(lats, lons, flood_grid, transform)
+    flooded_per_edge = flooded.reshape(len(candidates), sample_points).any(axis=1)
+    
+    return [edge_keys[i] for i in candidates[flooded_per_edge]]
+
+
+def get_flooded_nodes(nodes: NodeArrays,
+                      flood_grid: np.ndarray,
+                      transform: GridTransform) -> np.ndarray:
+    """
+    Check every node for flooding in a single vectorized pass.
     
-    for distance in distances:
-        point = edge_geometry.interpolate(distance)
-        lon, lat = point.x, point.y
-        
-        if is_node_flooded(lat, lon, flood_grid, north, south, east, west):
-            return True
+    The bounding box is inclusive, so nodes lying exactly on the south or
+    east edge (e.g. at the start or destination) use the last row/column
+    of the grid instead of being treated as outside it.
     
-    return False
+    Returns:
+    --------
+    np.ndarray
+        IDs of the flooded nodes
+    """
+    lat, lon = nodes.lat, nodes.lon
+    
+    row, col, _ = latlon_to_grid_coords(lat, lon, transform)
+    row = np.clip(row, 0, transform.rows - 1)
+    col = np.clip(col, 0, transform.cols - 1)
+    
+    in_bbox = ((lat <= transform.north) & (lat >= transform.south) &
+               (lon >= transform.west) & (lon <= transform.east))
+    flooded = in_bbox & (flood_grid[row, col] == 1)
+    return nodes.node_ids[flooded]
+
 
 def get_reachable_roads(north: float, south: float, east: float, west: float,
                         flood_grid: np.ndarray,
@@ -147,73 +575,57 @@ def get_reachable_roads(north: float, south: float, east: float, west: float,
         Graph containing only reachable (non-flooded) roads
     """
     # Download the road network
-    print("Downloading road network...")
+    logger.debug("Downloading road network...")
     G = get_road_network(north, south, east, west, network_type)
-    print(f"Original network: {len(G.nodes)} nodes, {len(G.edges)} edges")
+    logger.debug("Original network: %d nodes, %d edges", len(G.nodes), len(G.edges))
     
-    # Identify flooded nodes
-    print("Identifying flooded intersections...")
-    flooded_nodes = []
+    # One byte per cell keeps the grid lookups in the vectorized checks cheap
+    flood_grid = np.asarray(flood_grid, dtype=np.uint8)
+    transform = make_grid_transform(north, south, east, west, flood_grid.shape)
     
-    for node, data in G.nodes(data=True):
-        lat = data['y']
-        lon = data['x']
-        
-        if is_node_flooded(lat, lon, flood_grid, north, south, east, west):
-            flooded_nodes.append(node)
+    # Identify flooded nodes
+    logger.debug("Identifying flooded intersections...")
+    flooded_nodes = get_flooded_nodes(build_node_arrays(G), flood_grid, transform).tolist()
     
-    print(f"Found {len(flooded_nodes)} flooded intersections")
+    logger.debug("Found %d flooded intersections", len(flooded_nodes))
     
     # Remove flooded nodes and their connected edges
     G.remove_nodes_from(flooded_nodes)
-    print(f"After removing flooded nodes: {len(G.nodes)} nodes, {len(G.edges)} edges")
+    logger.debug("After removing flooded nodes: %d nodes, %d edges", len(G.nodes), len(G.edges))
     
     # Identify and remove flooded edges
-    print("Identifying flooded road segments...")
-    flooded_edges = []
+    logger.debug("Identifying flooded road segments...")
+    flooded_edges = get_flooded_edges(G, flood_grid, transform,
+                                      sample_points=edge_sample_points)
     
-    for u, v, key, data in G.edges(keys=True, data=True):
-        # Get edge geometry
-        if 'geometry' in data:
-            edge_geom = data['geometry']
-        else:
-            # If no geometry, create a straight line between nodes
-            u_data = G.nodes[u]
-            v_data = G.nodes[v]
-            edge_geom = LineString([(u_data['x'], u_data['y']), 
-                                   (v_data['x'], v_data['y'])])
-        
-        # Check if edge passes through flooded area
-        if is_edge_flooded(edge_geom, flood_grid, north, south, east, west, 
-                          sample_points=edge_sample_points):
-            flooded_edges.append((u, v, key))
-    
-    print(f"Found {len(flooded_edges)} flooded road segments")
+    logger.debug("Found %d flooded road segments", len(flooded_edges))
     
     # Remove flooded edges
     G.remove_edges_from(flooded_edges)
-    print(f"After removing flooded edges: {len(G.nodes)} nodes, {len(G.edges)} edges")
-    
-    # Convert to undirected to find connected components
-    G_undirected = G.to_undirected()
+    logger.debug("After removing flooded edges: %d nodes, %d edges", len(G.nodes), len(G.edges))
     
-    # Get the largest connected component (or component containing start_node)
+    # Weakly connected components of a directed graph are the connected
+    # components of its undirected form, without building an undirected copy.
+    # Get the largest one (or the component containing start_node)
     if start_node is not None and start_node in G:
-        components = list(nx.connected_components(G_undirected))
         main_component = None
-        for comp in components:
+        for comp in nx.weakly_connected_components(G):
             if start_node in comp:
                 main_component = comp
                 break
         if main_component is None:
-            print(f"Warning: start_node {start_node} not found in any component")
-            main_component = max(nx.connected_components(G_undirected), key=len)
+            logger.warning("start_node %s not found in any component", start_node)
+            main_component = max(nx.weakly_connected_components(G), key=len)
     else:
-        main_component = max(nx.connected_components(G_undirected), key=len)
+        main_component = max(nx.weakly_connected_components(G), key=len)
     
-    # Filter the original directed graph to keep only nodes in main component
-    G_reachable = G.subgraph(main_component).copy()
+    # G is already a private copy (see get_road_network), so drop the other
+    # components in place rather than copying the main one into a new graph
+    G.remove_nodes_from([node for node in G if node not in main_component])
+    G_reachable = G
+    G_reachable.graph['node_arrays'] = build_node_arrays(G_reachable)
+    G_reachable.graph['edge_matrix'] = build_edge_matrix(G_reachable, G_reachable.graph['node_arrays'])
     
-    print(f"Main connected component: {len(G_reachable.nodes)} nodes, {len(G_reachable.edges)} edges")
+    logger.debug("Main connected component: %d nodes, %d edges", len(G_reachable.nodes), len(G_reachable.edges))
     
     return G_reachable